@@ -4,20 +4,26 @@ Handles movie search, recommendations, and database queries.
 """
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-import sys
-import os
-import re
-
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from sqlalchemy import select, text
+import time
 
 from data.database import SessionLocal
 from data.models import Movie
-from utils.recommender import recommend_by_title
+from backend.utils.recommender import recommend_by_id, recommend_by_title
+from backend.utils.text import normalize_title, rank_titles
 
 router = APIRouter()
 
+# Movie count cache (catalog rarely changes, so avoid COUNT(*) per page)
+TOTAL_MOVIES_TTL = 300  # seconds
+_total_movies = None
+_total_movies_loaded_at = 0.0
+
+# Trigram shortlist size before re-ranking titles in Python; the % operator
+# uses pg_trgm's default similarity_threshold of 0.3
+SEARCH_CANDIDATES = 200
+
+
 def get_db():
     """Database session dependency."""
     db = SessionLocal()
@@ -27,16 +33,15 @@ def get_db():
         db.close()
 
 
-def normalize_title(title):
-    """
-    Clean movie titles for better search matching.
-    Removes articles (the, a, an) and normalizes punctuation.
-    """
-    title = title.lower().strip()
-    title = re.sub(r'^(the|a|an)\s+', '', title)  # Remove articles
-    title = re.sub(r'[^\w\s]', ' ', title)        # Replace punctuation with spaces
-    title = re.sub(r'\s+', ' ', title).strip()    # Clean multiple spaces
-    return title
+def get_total_movies(db: Session):
+    """Return the number of movies, cached for TOTAL_MOVIES_TTL seconds."""
+    global _total_movies, _total_movies_loaded_at
+
+    now = time.monotonic()
+    if _total_movies is None or now - _total_movies_loaded_at > TOTAL_MOVIES_TTL:
+        _total_movies = db.query(Movie).count()
+        _total_movies_loaded_at = now
+    return _total_movies
 
 
 @router.get("/movies/", tags=["movies"])
@@ -46,12 +51,17 @@ def get_movies(
     db: Session = Depends(get_db),
 ):
     """Get all movies with pagination."""
-    movies = db.query(Movie).offset(skip).limit(limit).all()
+    # Core select returns plain row mappings, skipping ORM object hydration
+    movies = (
+        db.execute(select(Movie.__table__).offset(skip).limit(limit))
+        .mappings()
+        .all()
+    )
     return {
         "movies": movies,
         "skip": skip,
         "limit": limit,
-        "total": db.query(Movie).count(),
+        "total": get_total_movies(db),
     }
 
 
@@ -69,8 +79,14 @@ def get_movies_by_genre(
     genre_name: str, limit: int = Query(50, ge=1, le=100), db: Session = Depends(get_db)
 ):
     """Get movies filtered by genre."""
+    # Array containment hits the GIN index on genres_arr
+    genre_filter = text("genres_arr @> ARRAY[:genre]").bindparams(
+        genre=genre_name.lower().strip()
+    )
     movies = (
-        db.query(Movie).filter(Movie.genres.like(f"%{genre_name}%")).limit(limit).all()
+        db.execute(select(Movie.__table__).where(genre_filter).limit(limit))
+        .mappings()
+        .all()
     )
     return {"genre": genre_name, "movies": movies, "count": len(movies)}
 
@@ -80,7 +96,10 @@ def search_movies(
     q: str = Query(..., min_length=1, description="Search query"),
     limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
     min_similarity: float = Query(
-        0.30, ge=0.1, le=1.0, description="Minimum similarity score"
+        0.75,
+        ge=0.1,
+        le=1.0,
+        description="Minimum RapidFuzz WRatio match score, scaled to 0-1",
     ),
     db: Session = Depends(get_db),
 ):
@@ -88,48 +107,38 @@ def search_movies(
     original_query = q.strip()
     normalized_query = normalize_title(original_query)
 
+    # The % predicate uses the GIN trigram index to narrow the table; the
+    # ORDER BY is a plain sort that keeps the best SEARCH_CANDIDATES matches
     sql = text(
         """
-        WITH normalized_movies AS (
-            SELECT 
-                "ID" as id, "primaryTitle" as primarytitle, "startYear" as startyear, "averageRating" as averagerating,
-                REGEXP_REPLACE(
-                    REGEXP_REPLACE(LOWER("primaryTitle"), '^(the|a|an)\\s+', ''), 
-                    '[^\\w\\s]', ' ', 'g'
-                ) AS normalized_title
-            FROM movies
-        )
         SELECT
-            id, primarytitle, startyear, averagerating,
-            GREATEST(
-                similarity(normalized_title, :normalized_q),
-                similarity(LOWER(primarytitle), LOWER(:original_q))
-            ) AS similarity_score
-        FROM normalized_movies
-        WHERE (
-            normalized_title % :normalized_q 
-            OR LOWER(primarytitle) % LOWER(:original_q)
-        )
-        AND GREATEST(
-            similarity(normalized_title, :normalized_q),
-            similarity(LOWER(primarytitle), LOWER(:original_q))
-        ) >= :min_sim
-        ORDER BY similarity_score DESC
-        LIMIT :limit
+            "ID" AS id, "primaryTitle" AS primarytitle, "startYear" AS startyear,
+            "averageRating" AS averagerating, normalized_title
+        FROM movies
+        WHERE normalized_title % :normalized_q
+        ORDER BY similarity(normalized_title, :normalized_q) DESC
+        LIMIT :candidates
     """
     )
 
-    results = (
+    candidates = (
         db.execute(sql, {
-            "original_q": original_query, 
             "normalized_q": normalized_query, 
-            "limit": limit, 
-            "min_sim": min_similarity
+            "candidates": SEARCH_CANDIDATES
         })
         .mappings()
         .all()
     )
 
+    # Re-rank the shortlist by edit distance
+    titles = [row["normalized_title"] for row in candidates]
+    results = []
+    for idx, score in rank_titles(normalized_query, titles, limit, min_similarity):
+        movie = dict(candidates[idx])
+        del movie["normalized_title"]
+        movie["similarity_score"] = score
+        results.append(movie)
+
     return {"query": original_query, "results": results, "count": len(results)}
 
 
@@ -138,6 +147,10 @@ def get_recommendations(
     title: str = Query(..., min_length=1, description="Movie title for recommendations"),
     k: int = Query(10, ge=1, le=50, description="Number of recommendations"),
     fuzzy: bool = Query(True, description="Enable fuzzy title matching"),
+    min_rating: float = Query(None, ge=0, le=10, description="Minimum IMDb rating"),
+    min_votes: int = Query(None, ge=0, description="Minimum number of votes"),
+    year_from: int = Query(None, description="Earliest release year"),
+    year_to: int = Query(None, description="Latest release year"),
     db: Session = Depends(get_db),
 ):
     """
@@ -145,16 +158,24 @@ def get_recommendations(
     Uses fuzzy matching to handle typos and variations in movie titles.
     """
     resolved_title = title
+    filters = {
+        "min_rating": min_rating,
+        "min_votes": min_votes,
+        "year_from": year_from,
+        "year_to": year_to,
+    }
     
     # Try to get recommendations
-    result = recommend_by_title(title, k)
+    result = recommend_by_title(title, k, **filters)
     
     # If movie not found and fuzzy is enabled, try to find similar title
     if "error" in result and fuzzy:
-        similar_title = _find_similar_title(db, title)
-        if similar_title:
-            resolved_title = similar_title
-            result = recommend_by_title(resolved_title, k)
+        match = _find_similar_title(db, title)
+        if match:
+            # Recommend by the matched row's ID so title collisions can't
+            # redirect to a different movie
+            movie_id, resolved_title = match
+            result = recommend_by_id(movie_id, k, **filters)
 
     if "error" in result:
         raise HTTPException(status_code=404, detail=result["error"])
@@ -168,16 +189,27 @@ def get_recommendations(
 
 
 def _find_similar_title(db: Session, title: str):
-    """Helper function to find similar movie title using fuzzy matching."""
+    """
+    Helper function to find similar movie title using fuzzy matching.
+    Returns (ID, primaryTitle) of the best match, or None.
+    """
     search_sql = text(
         """
-        SELECT "primaryTitle"
+        SELECT "ID", "primaryTitle", normalized_title
         FROM movies 
-        WHERE LOWER("primaryTitle") % LOWER(:q)
-        ORDER BY similarity(LOWER("primaryTitle"), LOWER(:q)) DESC 
-        LIMIT 1
+        WHERE normalized_title % :q
+        ORDER BY similarity(normalized_title, :q) DESC
+        LIMIT :candidates
         """
     )
-    result = db.execute(search_sql, {"q": title}).fetchone()
-    return result[0] if result else None
+    normalized_query = normalize_title(title)
+    candidates = db.execute(
+        search_sql, {"q": normalized_query, "candidates": SEARCH_CANDIDATES}
+    ).fetchall()
+
+    best = rank_titles(normalized_query, [row[2] for row in candidates], 1)
+    if not best:
+        return None
+    movie_id, primary_title, _ = candidates[best[0][0]]
+    return movie_id, primary_title
 
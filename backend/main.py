@@ -4,48 +4,52 @@ FastAPI Movie Recommendation System
 Main application entry point that sets up the web server, database,
 and API routes for the movie recommendation service.
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import sys
-import os
-
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fastapi.middleware.gzip import GZipMiddleware
 
-from core.config import API_TITLE, API_VERSION, DEBUG
-from api.routes import router
+from backend.core.config import API_TITLE, API_VERSION, CORS_ORIGINS, DEBUG
+from backend.api.routes import router
+from backend.utils.recommender import load_data
 from data.database import Base, engine
+from data.migrations import run_migrations
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load recommendation data before serving so no request pays for it."""
+    load_data()
+    yield
+
 
 # Create FastAPI application with metadata
 app = FastAPI(
     title=API_TITLE,
     version=API_VERSION,
-    description="A movie recommendation system using content-based filtering"
+    description="A movie recommendation system using content-based filtering",
+    lifespan=lifespan,
 )
 
 # Configure CORS for frontend access
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        # Local development
-        "http://localhost:3000", 
-        "http://127.0.0.1:3000", 
-        "http://localhost:5173", 
-        "http://localhost:5174",
-        # Production deployments
-        "https://movie-recommendation-system-p41ucrff4.vercel.app",
-        "https://movie-recommendation-system-orpin.vercel.app"
-    ],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Compress larger JSON payloads such as recommendation lists
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Include API routes with version prefix
 app.include_router(router, prefix="/api/v1")
 
-# Initialize database tables
+# Initialize database tables and search indexes
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 @app.get("/", tags=["health"])
 def health_check():
@@ -58,4 +62,4 @@ def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=DEBUG)
+    uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=DEBUG)
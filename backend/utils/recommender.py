@@ -6,40 +6,74 @@ import joblib
 import pandas as pd
 import numpy as np
 import os
+from functools import lru_cache
+from sklearn.preprocessing import normalize
+
+from backend.utils.text import normalize_title
 
 # Global variables for loaded data (loaded once for performance)
 matrix = None
 movies = None
 title_map = None
+normalized_title_map = None
+id_map = None
+movie_ratings = None
+movie_votes = None
+movie_years = None
+
+# Number of (movie, count) results kept in the in-process cache
+RECOMMENDATION_CACHE_SIZE = 1024
 
 
 def load_data():
     """Load TF-IDF matrix and movie data into memory."""
-    global matrix, movies, title_map
+    global matrix, movies, title_map, normalized_title_map, id_map
+    global movie_ratings, movie_votes, movie_years
 
     if matrix is not None:
         return  # Already loaded
 
     current_dir = os.path.dirname(__file__)
-    data_path = os.path.join(current_dir, "..", "data", "models")
+    data_path = os.path.join(current_dir, "..", "..", "data", "models")
 
     # Load pre-computed models and data
     matrix = joblib.load(os.path.join(data_path, "tfidf_matrix.joblib"))
-    movies = pd.read_csv(os.path.join(data_path, "movies_meta.csv"))
-
-    # Create fast title lookup dictionary
+    # CSR float32 halves memory traffic; unit rows make the dot product cosine
+    matrix = matrix.astype(np.float32).tocsr()
+    normalize(matrix, norm="l2", copy=False)
+    movies = pd.read_parquet(os.path.join(data_path, "movies_meta.parquet"))
+
+    # Create fast title lookup dictionaries: exact titles first, then titles
+    # normalized like the search index. For duplicated titles the first,
+    # higher-ranked row wins in both
+    titles = movies["primaryTitle"].astype(str)
     title_map = {}
-    for i, title in enumerate(movies["primaryTitle"]):
-        title_map[str(title).lower()] = i
-
-
-def recommend_by_title(title, count=10):
+    for i, key in enumerate(titles.str.lower().str.strip()):
+        title_map.setdefault(key, i)
+    normalized_title_map = {}
+    for i, key in enumerate(titles.map(normalize_title)):
+        normalized_title_map.setdefault(key, i)
+    id_map = dict(zip(movies["ID"].tolist(), range(len(movies))))
+
+    # Metadata arrays for vectorized recommendation filters
+    movie_ratings = movies["averageRating"].to_numpy(dtype=np.float64)
+    movie_votes = movies["numVotes"].to_numpy(dtype=np.float64)
+    movie_years = movies["startYear"].to_numpy(dtype=np.float64)
+
+
+def recommend_by_title(
+    title, count=10, min_rating=None, min_votes=None, year_from=None, year_to=None
+):
     """
     Get movie recommendations based on content similarity.
     
     Args:
         title (str): Movie title to find recommendations for
         count (int): Number of recommendations to return
+        min_rating (float): Only recommend movies rated at least this
+        min_votes (int): Only recommend movies with at least this many votes
+        year_from (int): Only recommend movies released in or after this year
+        year_to (int): Only recommend movies released in or before this year
         
     Returns:
         dict: Contains title and list of recommended movies with scores
@@ -49,27 +83,121 @@ def recommend_by_title(title, count=10):
     if matrix is None or movies is None or title_map is None:
         return {"error": "Failed to load model data"}
 
-    clean_title = title.lower().strip()
+    movie_idx = title_map.get(title.lower().strip())
+    if movie_idx is None:
+        movie_idx = normalized_title_map.get(normalize_title(title))
 
-    if clean_title not in title_map:
+    if movie_idx is None:
         return {"error": f"Movie '{title}' not found"}
 
-    movie_idx = title_map[clean_title]
+    filters = (min_rating, min_votes, year_from, year_to)
+    return {
+        "title": title,
+        "recommendations": _recommendations(movie_idx, count, filters),
+    }
+
+
+def recommend_by_id(
+    movie_id, count=10, min_rating=None, min_votes=None, year_from=None, year_to=None
+):
+    """
+    Get movie recommendations for a movie identified by its catalog ID.
+
+    Args:
+        movie_id (int): ID of the movie in the catalog
+        count (int): Number of recommendations to return
+        min_rating, min_votes, year_from, year_to: Same as recommend_by_title
+
+    Returns:
+        dict: Contains the movie's title and list of recommended movies with scores
+    """
+    load_data()
+
+    if matrix is None or movies is None or id_map is None:
+        return {"error": "Failed to load model data"}
+
+    movie_idx = id_map.get(movie_id)
+    if movie_idx is None:
+        return {"error": f"Movie with ID {movie_id} not found"}
+
+    filters = (min_rating, min_votes, year_from, year_to)
+    return {
+        "title": movies["primaryTitle"].iat[movie_idx],
+        "recommendations": _recommendations(movie_idx, count, filters),
+    }
+
+
+def _recommendations(movie_idx, count, filters):
+    """Cached recommendations for a row, copied so callers can't mutate them."""
+    return [dict(movie) for movie in _recommend_by_index(movie_idx, count, *filters)]
+
+
+def _filter_mask(min_rating, min_votes, year_from, year_to):
+    """Boolean mask of movies passing the filters, or None if no filter is set."""
+    mask = None
+    for values, bound, is_lower in (
+        (movie_ratings, min_rating, True),
+        (movie_votes, min_votes, True),
+        (movie_years, year_from, True),
+        (movie_years, year_to, False),
+    ):
+        if bound is None:
+            continue
+        passes = values >= bound if is_lower else values <= bound
+        mask = passes if mask is None else mask & passes
+    return mask
+
+
+def _row_similarities(movie_idx):
+    """Cosine similarity between one movie row and every movie."""
+    # Scatter the row's nonzeros straight from the CSR arrays into a dense
+    # query, avoiding a sparse row slice; matrix x dense vector is then a
+    # single compiled CSR matvec
+    start, end = matrix.indptr[movie_idx], matrix.indptr[movie_idx + 1]
+    query = np.zeros(matrix.shape[1], dtype=matrix.dtype)
+    query[matrix.indices[start:end]] = matrix.data[start:end]
+    return matrix.dot(query)
+
+
+def top_similar(movie_idx, count, mask=None):
+    """
+    Find the movies most similar to a movie row.
+
+    Args:
+        movie_idx (int): Row of the movie in the TF-IDF matrix
+        count (int): Maximum number of similar movies to return
+        mask (np.ndarray): Optional boolean array of movies allowed in results
+
+    Returns:
+        tuple: (row indices, similarity scores) as arrays, best first
+    """
+    sims = _row_similarities(movie_idx)
+
+    # Filtered-out movies can never enter the top-k
+    if mask is not None:
+        sims[~mask] = -np.inf
+
+    # Partially select the top count + 1, then sort only those
+    n = min(count + 1, sims.shape[0])
+    top_idx = np.argpartition(-sims, n - 1)[:n]
+    top_idx = top_idx[np.argsort(-sims[top_idx])]
+    top_idx = top_idx[top_idx != movie_idx]  # Exclude the input movie
+    top_idx = top_idx[np.isfinite(sims[top_idx])][:count]
+
+    return top_idx, sims[top_idx]
 
-    # Calculate similarity between selected movie and all others
-    selected_movie_vector = matrix[movie_idx]
-    similarity_matrix = selected_movie_vector.dot(matrix.T)
-    sims = similarity_matrix.toarray().flatten()
-    sims[movie_idx] = -1  # Exclude the input movie from results
 
-    # Get top similar movies
-    top_idx = np.argsort(-sims)[:count]
+@lru_cache(maxsize=RECOMMENDATION_CACHE_SIZE)
+def _recommend_by_index(
+    movie_idx, count, min_rating=None, min_votes=None, year_from=None, year_to=None
+):
+    """Compute the top recommendations for a movie row, cached per arguments."""
+    mask = _filter_mask(min_rating, min_votes, year_from, year_to)
+    top_idx, scores = top_similar(movie_idx, count, mask)
 
-    # Format results with similarity scores
-    results = []
-    for idx in top_idx:
-        movie = movies.iloc[idx].to_dict()
-        movie["score"] = float(sims[idx])
-        results.append(movie)
+    # Build dicts only for the surviving rows, in one batched conversion
+    results = movies.iloc[top_idx].to_dict(orient="records")
+    for movie, score in zip(results, scores.tolist()):
+        movie["score"] = score
 
-    return {"title": title, "recommendations": results}
+    return tuple(results)
@@ -0,0 +1,42 @@
+"""
+Text helpers shared by the API routes and the recommender.
+"""
+import re
+
+from rapidfuzz import fuzz, process
+
+# Precompiled patterns used by normalize_title
+_ARTICLE_RE = re.compile(r'^(the|a|an)\s+')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_title(title):
+    """
+    Clean movie titles for better search matching.
+    Removes articles (the, a, an) and normalizes punctuation.
+    """
+    title = title.lower().strip()
+    title = _ARTICLE_RE.sub('', title)          # Remove articles
+    title = _PUNCT_RE.sub(' ', title)           # Replace punctuation with spaces
+    title = _SPACE_RE.sub(' ', title).strip()   # Clean multiple spaces
+    return title
+
+
+def rank_titles(query, titles, limit, min_score=0.0):
+    """
+    Re-rank candidate titles by edit-distance similarity to the query.
+
+    Args:
+        query (str): Normalized search query
+        titles (list): Normalized candidate titles
+        limit (int): Maximum number of matches to return
+        min_score (float): Minimum similarity between 0 and 1
+
+    Returns:
+        list: (index into titles, score between 0 and 1) pairs, best first
+    """
+    matches = process.extract(
+        query, titles, scorer=fuzz.WRatio, limit=limit, score_cutoff=min_score * 100
+    )
+    return [(idx, score / 100) for _, score, idx in matches]
@@ -10,6 +10,14 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 
 if not DATABASE_URL:
     raise Exception("SOMETHING WRONG WITH THE .ENV FILE")
-engine = create_engine(DATABASE_URL)
+
+# Pool sized for concurrent requests; pre-ping drops stale connections
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=20,
+    max_overflow=10,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -0,0 +1,47 @@
+"""
+Database migrations for the movies table.
+Adds precomputed search columns and the indexes the API queries rely on.
+Every statement is idempotent, so migrations run safely on each startup.
+"""
+from sqlalchemy import text
+
+MIGRATIONS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # Same rules as normalize_title() in the API: drop leading article,
+    # replace punctuation with spaces and collapse whitespace
+    """
+    ALTER TABLE movies ADD COLUMN IF NOT EXISTS normalized_title TEXT
+    GENERATED ALWAYS AS (
+        BTRIM(REGEXP_REPLACE(
+            REGEXP_REPLACE(
+                REGEXP_REPLACE(LOWER(BTRIM("primaryTitle")), '^(the|a|an)\\s+', ''),
+                '[^\\w\\s]', ' ', 'g'
+            ),
+            '\\s+', ' ', 'g'
+        ))
+    ) STORED
+    """,
+    # Trigram index so % and similarity() avoid sequential scans
+    """
+    CREATE INDEX IF NOT EXISTS movies_normtitle_trgm
+    ON movies USING gin (normalized_title gin_trgm_ops)
+    """,
+    # Genres stored as "Crime, Drama"; split into an array for indexed lookups
+    """
+    ALTER TABLE movies ADD COLUMN IF NOT EXISTS genres_arr TEXT[]
+    GENERATED ALWAYS AS (
+        REGEXP_SPLIT_TO_ARRAY(LOWER(BTRIM(genres)), '\\s*,\\s*')
+    ) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS movies_genres_gin
+    ON movies USING gin (genres_arr)
+    """,
+]
+
+
+def run_migrations(engine):
+    """Apply all migrations in a single transaction."""
+    with engine.begin() as conn:
+        for statement in MIGRATIONS:
+            conn.execute(text(statement))
@@ -1,34 +1,41 @@
+import os
+
+import joblib
+import numpy as np
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 
-df = pd.read_csv("data/MovieDataSet.csv")
-tfidf = TfidfVectorizer()
-
-encoding = []
-for idx, row in df.iterrows():
-    # Convert to string, handle NaN
-    directors = str(row.get("directors", "") or "")
-    writers = str(row.get("writers", "") or "")
-    genres = str(row.get("genres", "") or "")
-
-    director_string = " ".join(
-        d.strip().lower().replace(" ", "_")
-        for d in directors.split(",")
-        if d and d != "nan"
-    )
-    writer_string = " ".join(
-        w.strip().lower().replace(" ", "_")
-        for w in writers.split(",")
-        if w and w != "nan"
-    )
-    genre_string = " ".join(
-        g.strip().lower().replace(" ", "_")
-        for g in genres.split(",")
-        if g and g != "nan"
+MODELS_DIR = "data/models"
+
+
+def clean_tokens(text):
+    """Turn a comma separated name list into space separated tokens."""
+    if pd.isna(text):
+        return ""
+    return " ".join(
+        t.strip().lower().replace(" ", "_")
+        for t in str(text).split(",")
+        if t and t.strip().lower() != "nan"
     )
 
-    document = f"{director_string} {writer_string} {genre_string}"
-    result = tfidf.fit_transform(document)
-    encoding.append(result)
-df["encodings"] = encoding
-df.to_csv("data/MovieDataSet+Vectors.csv")
+
+df = pd.read_csv("data/MovieDataSet.csv")
+
+# One document per movie: directors, writers and genres as tokens
+docs = (
+    df["directors"].apply(clean_tokens) + " " +
+    df["writers"].apply(clean_tokens) + " " +
+    df["genres"].apply(clean_tokens)
+).str.strip()
+
+# Fit once over all documents so every movie shares one vocabulary
+tfidf = TfidfVectorizer(token_pattern=r"[a-z0-9_]+", dtype=np.float32)
+X = tfidf.fit_transform(docs)
+
+# Rows of movies_meta.parquet line up with rows of the TF-IDF matrix
+os.makedirs(MODELS_DIR, exist_ok=True)
+joblib.dump(tfidf, os.path.join(MODELS_DIR, "tfidf_vectorizer.joblib"))
+joblib.dump(X, os.path.join(MODELS_DIR, "tfidf_matrix.joblib"))
+df[["ID", "primaryTitle", "startYear", "averageRating", "numVotes", "tconst"]].to_parquet(
+    os.path.join(MODELS_DIR, "movies_meta.parquet"), index=False
+)